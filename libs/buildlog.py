@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+'''Reading build logs stored by vanirbuilder.BuildLog service - plain or
+compressed with gzip or zstd (detected by content, not the file name).
+
+If the log has a sidecar index (<log>.idx, written by the BuildLog service
+and by scripts/build, see format description there), reading can start
+directly at a section or a checkpoint.'''
+
+import calendar
+import collections
+import os
+import re
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+READ_SIZE = 256 * 1024
+
+INDEX_HEADER = b'# vanir-build-log-index 1'
+# keep in sync with rpc-services/vanirbuilder.BuildLog
+SECTION_RE = re.compile(
+    br'^(> starting build with log|> running make|> done|'
+    br'-> Building .* for |--> build failed!)')
+# line prefix added by BuildLog service
+LINE_RE = re.compile(
+    br'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\.(\d{6}) \+0000 \S*?[:+>] ')
+
+IndexEntry = collections.namedtuple('IndexEntry',
+    ['log_offset', 'file_offset', 'skip', 'time', 'kind', 'label'])
+
+
+class PlainDecompressor(object):
+    unused_data = b''
+
+    def decompress(self, data):
+        return data
+
+
+class GzipDecompressor(object):
+    '''Decompress (possibly multi-member) gzip stream'''
+    def __init__(self):
+        self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, data):
+        result = []
+        while data:
+            result.append(self.decompressor.decompress(data))
+            data = self.decompressor.unused_data
+            if data:
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return b''.join(result)
+
+
+class ZstdDecompressor(object):
+    '''Decompress (possibly multi-frame) zstd stream'''
+    def __init__(self):
+        if zstandard is None:
+            raise IOError('python zstandard module is required to read '
+                          'zstd-compressed logs')
+        self.decompressor = self.new_frame()
+
+    @staticmethod
+    def new_frame():
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        # needed to find where a frame ends; without them, data after the
+        # first frame would be silently lost
+        if not hasattr(decompressor, 'unused_data') or \
+                not hasattr(decompressor, 'eof'):
+            raise IOError('python zstandard >= 0.18 is required to read '
+                          'zstd-compressed logs')
+        return decompressor
+
+    def decompress(self, data):
+        result = []
+        while data:
+            if self.decompressor.eof:
+                # the previous frame is complete, this data starts the next
+                self.decompressor = self.new_frame()
+            result.append(self.decompressor.decompress(data))
+            data = self.decompressor.unused_data
+        return b''.join(result)
+
+
+def get_decompressor(header):
+    '''Choose decompressor based on first bytes of the file'''
+    if header.startswith(GZIP_MAGIC):
+        return GzipDecompressor()
+    if header.startswith(ZSTD_MAGIC):
+        return ZstdDecompressor()
+    return PlainDecompressor()
+
+
+def read_index(path):
+    '''Return list of IndexEntry of the log at *path*, or None if there is
+    no index'''
+    try:
+        with open(path + '.idx', 'rb') as index_file:
+            if not index_file.readline().startswith(INDEX_HEADER):
+                return None
+            entries = []
+            for line in index_file:
+                values = line.rstrip(b'\n').split(b'\t', 5)
+                if len(values) != 6:
+                    continue
+                entries.append(IndexEntry(int(values[0]), int(values[1]),
+                    int(values[2]), float(values[3]),
+                    values[4].decode('ascii'), values[5]))
+            return entries
+    except IOError:
+        return None
+
+
+def temporary_log(path):
+    '''Return path of the file the BuildLog service is writing the log at
+    *path* to, or None if the log is complete.
+
+    The service reserves the name with an empty file, writes the log to
+    hidden .<name>.XXXXXXXX file next to it and renames it over the reserved
+    one at the end.'''
+    try:
+        if os.path.getsize(path):
+            return None
+    except OSError:
+        return None
+    directory, name = os.path.split(path)
+    # not .<name>.idx.XXXXXXXX - index being written
+    temp_re = re.compile(re.escape('.' + name + '.') + r'[^.]+$')
+    candidates = []
+    for entry in os.listdir(directory or os.curdir):
+        if temp_re.match(entry):
+            try:
+                candidates.append((os.path.getmtime(
+                    os.path.join(directory, entry)), entry))
+            except OSError:
+                pass
+    if not candidates:
+        return None
+    return os.path.join(directory, max(candidates)[1])
+
+
+def open_log(path, follow=False):
+    '''Open the log; with *follow*, the file being written if the log is
+    not complete yet'''
+    if follow:
+        temp_path = temporary_log(path)
+        if temp_path is not None:
+            try:
+                # after the rename, it is the same file as *path*
+                return open(temp_path, 'rb')
+            except IOError:
+                # complete already
+                pass
+    return open(path, 'rb')
+
+
+def read_chunks(path, follow=False, poll_interval=1, start=None):
+    '''Yield decompressed content of the log, in chunks. With *follow*, wait
+    for more data at the end of file (like tail -f), following also the log
+    still being written by BuildLog service; only the data that the writer
+    has flushed already can be returned then. Reading starts at *start*
+    IndexEntry, if given.'''
+    skip = 0
+    with open_log(path, follow) as log_file:
+        if start is not None:
+            log_file.seek(start.file_offset)
+            skip = start.skip
+        decompressor = None
+        header = b''
+        while True:
+            data = log_file.read(READ_SIZE)
+            if not data:
+                if not follow:
+                    break
+                time.sleep(poll_interval)
+                continue
+            if decompressor is None:
+                header += data
+                if len(header) < len(ZSTD_MAGIC):
+                    continue
+                decompressor = get_decompressor(header)
+                data = header
+            chunk = decompressor.decompress(data)
+            if skip:
+                skipped = min(skip, len(chunk))
+                chunk = chunk[skipped:]
+                skip -= skipped
+            if chunk:
+                yield chunk
+        if decompressor is None and header:
+            yield header
+
+
+def read_lines(path, follow=False, start=None):
+    '''Yield lines (including the line separator) of the log'''
+    pending = b''
+    for chunk in read_chunks(path, follow=follow, start=start):
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + b'\n'
+    if pending:
+        yield pending
+
+
+def tail_lines(path, count):
+    '''Return last *count* lines of the log'''
+    return list(collections.deque(read_lines(path), maxlen=count))
+
+
+def line_message(line):
+    '''Return the line without BuildLog prefix'''
+    match = LINE_RE.match(line)
+    if match:
+        return line[match.end():]
+    return line
+
+
+def line_time(line):
+    '''Return time (unix timestamp) of the line, if it has BuildLog prefix'''
+    match = LINE_RE.match(line)
+    if not match:
+        return None
+    return calendar.timegm(time.strptime(
+        match.group(1).decode('ascii'), '%Y-%m-%d %H:%M:%S')) + \
+        int(match.group(2)) / 1000000.0
+
+
+def sections(path):
+    '''Return list of (time, label) of all the sections in the log'''
+    index = read_index(path)
+    if index is not None:
+        return [(entry.time, entry.label) for entry in index
+                if entry.kind == 'section']
+    result = []
+    for line in read_lines(path):
+        message = line_message(line).rstrip(b'\n')
+        if SECTION_RE.match(message):
+            result.append((line_time(line), message))
+    return result
+
+
+def section_lines(path, pattern):
+    '''Yield lines of all the sections with *pattern* in the label, from the
+    section marker up to the start of the next section'''
+    index = read_index(path)
+    if index is None:
+        # no index, read the whole log
+        in_section = False
+        for line in read_lines(path):
+            message = line_message(line)
+            if SECTION_RE.match(message):
+                in_section = pattern in message
+            if in_section:
+                yield line
+        return
+
+    index_sections = [entry for entry in index if entry.kind == 'section']
+    for i, entry in enumerate(index_sections):
+        if pattern not in entry.label:
+            continue
+        end = None
+        if i + 1 < len(index_sections):
+            end = index_sections[i + 1].log_offset
+        offset = entry.log_offset
+        for line in read_lines(path, start=entry):
+            if end is not None and offset >= end:
+                break
+            offset += len(line)
+            yield line
+
+
+def time_lines(path, since=None, until=None):
+    '''Yield lines logged between *since* and *until* (unix timestamps).
+    Lines without a timestamp are included when the surrounding index
+    entries do not exclude them.'''
+    index = read_index(path) or []
+    start = None
+    end = None
+    for entry in index:
+        if since is not None and entry.time <= since:
+            start = entry
+        if until is not None and entry.time > until and end is None:
+            end = entry.log_offset
+    offset = start.log_offset if start is not None else 0
+    for line in read_lines(path, start=start):
+        if end is not None and offset >= end:
+            break
+        offset += len(line)
+        timestamp = line_time(line)
+        if timestamp is None:
+            yield line
+            continue
+        if since is not None and timestamp < since:
+            continue
+        if until is not None and timestamp > until:
+            break
+        yield line
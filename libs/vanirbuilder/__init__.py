@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+'''vanir Builder Configuration Utility (setup.py).
+
+Modules are imported only by the setup.py commands which need them, so the
+package itself must stay cheap to import:
+
+- config - read-only access to builder configuration, for use also outside
+           of setup.py
+- info   - display builder.conf (`setup.py info`)
+- deps   - check and install builder dependencies (`setup.py install-deps`)
+- wizard - the configuration wizard, using `dialog`
+- runner - running external commands (make, git, gpg)
+- utils  - helpers shared by the above
+'''
+
+import os
+
+# Globals
+DIALOG = 'dialog'
+GPG_KEY_SERVER = 'pgp.mit.edu'
+
+# Global file locations
+BASE_DIR = os.getcwd()
+CONFIG_DIR = 'example-configs'
+OVERRIDE_CONF = 'override.conf'
+OVERRIDE_DATA = 'override.data'
+MASTER_TEMPLATE = 'templates.conf'
+BUILDER_CONF = 'builder.conf'
+BACKUP_EXTENSION = '.bak'
+VANIR_DEVELOPERS_KEYS = 'vanir-developers-keys.asc'
+GNUPGHOME = os.path.join(os.path.abspath(BASE_DIR), 'keyrings/git')
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+'''Read-only access to builder configuration.
+
+load() returns a snapshot of the configuration: variables resolved by the
+Makefiles (with builder.conf included) and releases, keys, repositories and
+builder plugins described in the setup data file (.setup.data, merged with
+override.data). Loading has no side effects - nothing is written, and if
+builder.conf does not exist yet, example-configs/templates.conf is read
+instead. Snapshots are immutable and cached until any of Makefile,
+builder.conf, override.conf or the data files change (or invalidate() is
+called), so the configuration can be read as often as needed. Makefiles are
+evaluated with three make calls, running at the same time.
+
+Changes are made only by explicit calls - create_builder_conf() here, the
+wizard for the rest.
+
+Works with both python 2 and 3.
+'''
+
+from __future__ import unicode_literals
+
+import codecs
+import collections
+import copy
+import os
+import re
+import shlex
+import shutil
+import threading
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+try:
+    import ConfigParser as configparser
+except ImportError:
+    import configparser
+
+from vanirbuilder import (
+    BUILDER_CONF, CONFIG_DIR, MASTER_TEMPLATE, OVERRIDE_CONF, OVERRIDE_DATA
+)
+from vanirbuilder.runner import get_runner
+
+try:
+    STRING_TYPES = basestring  # pylint: disable=E0602
+except NameError:
+    STRING_TYPES = str
+
+SETUP_DATA = '.setup.data'
+
+# Variables resolved by the Makefiles
+VARIABLES = (
+    'RELEASE',
+    'SSH_ACCESS',
+    'TEMPLATE_ONLY',
+    'BUILDER_PLUGINS_ALL',
+    'GIT_BASEURL',
+    'GIT_PREFIX',
+    'USE_VANIR_REPO_VERSION',
+    'USE_VANIR_REPO_TESTING',
+    'DISTS_VM',
+    'DIST_DOM0',
+    'TEMPLATE_ALIAS',
+    'TEMPLATE_LABEL',
+)
+
+DEFAULTS_BUILDER = {
+    'id': '',
+    'type': '',
+    'description': '',
+    'optional': [],
+    'require': [],
+    'require_in': [],
+    'development': False,
+}
+
+DEFAULTS_KEY = {
+    'id': '',
+    'type': '',
+    'key': '',
+    'owner': '',
+    'fingerprint': None,
+    'verify': '',
+    'url': '',
+}
+
+DEFAULTS_REPO = {'type': '', 'description': '', 'prefix': '', }
+
+Snapshot = collections.namedtuple('Snapshot', [
+    'dir_builder',
+    # {name: value} of VARIABLES
+    'variables',
+    # DISTS_VM with SETUP_MODE=1 - all the templates available
+    'dists_vm_all',
+    # output of `make about` - Makefiles included
+    'about',
+    # sections of the setup data file, by type
+    'releases',
+    'keys',
+    'repos',
+    'builders',
+])
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+# escapes in bash $'...' strings
+_ANSI_C_ESCAPE_RE = re.compile(
+    br'\\(?:([0-7]{1,3})|x([0-9a-fA-F]{1,2})|u([0-9a-fA-F]{1,4})|'
+    br'U([0-9a-fA-F]{1,8})|c(.)|(.))', re.DOTALL)
+_ANSI_C_ESCAPES = {
+    b'a': b'\a', b'b': b'\b', b'e': b'\x1b', b'E': b'\x1b', b'f': b'\f',
+    b'n': b'\n', b'r': b'\r', b't': b'\t', b'v': b'\v', b'\\': b'\\',
+    b"'": b"'", b'"': b'"', b'?': b'?',
+}
+
+
+class FrozenDict(Mapping):
+    '''Read-only (ordered) dictionary'''
+    def __init__(self, *args, **kwargs):
+        self._data = collections.OrderedDict(*args, **kwargs)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return 'FrozenDict({0!r})'.format(list(self._data.items()))
+
+
+def freeze(value):
+    '''Return read-only copy of *value* - dicts as FrozenDict, lists as
+    tuples'''
+    if isinstance(value, Mapping):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def coerce_value(default, value):
+    '''Convert *value* (as read from a file or Makefile) to the type of
+    *default*'''
+    if type(value) != type(default):
+        try:
+            if isinstance(default, bool):
+                value = bool(value)
+            elif isinstance(default, int):
+                value = int(value)
+            elif isinstance(default, float):
+                value = float(value)
+            elif isinstance(default, list):
+                if isinstance(value, STRING_TYPES):
+                    if value.strip().lower() in ['none', 'null']:
+                        value = []
+                    else:
+                        value = value.strip().split()
+            elif default is None:
+                value = None
+        except ValueError:
+            value = default
+    return value
+
+
+def coerce_values(defaults, values):
+    if not isinstance(defaults, Mapping):
+        return values
+    if isinstance(values, Mapping):
+        for key, value in values.items():
+            if key in defaults:
+                values[key] = coerce_value(defaults[key], value)
+    return values
+
+
+def read_section(parser, section_name):
+    adict = collections.OrderedDict()
+    for option in parser.options(section_name):
+        try:
+            adict[option] = parser.get(section_name, option)
+        except (configparser.Error, TypeError):
+            adict[option] = None
+    return adict
+
+
+def parse_sections(parser):
+    '''Sort sections of setup data *parser* by their type.
+
+    Returns (releases, keys, repos, builders); releases is None if there is
+    no such section.
+    '''
+    releases = None
+    keys = collections.OrderedDict()
+    repos = collections.OrderedDict()
+    builders = collections.OrderedDict()
+    for section_name in parser.sections():
+        section = read_section(parser, section_name)
+        if not section:
+            continue
+        section_type = section.get('type', section_name)
+        if section_type == 'gpg':
+            config = copy.deepcopy(DEFAULTS_KEY)
+            section['id'] = section_name
+            config.update(section)
+            keys[section_name] = config
+        elif section_type == 'repo':
+            config = copy.deepcopy(DEFAULTS_REPO)
+            config.update(section)
+            repos[section_name] = config
+        elif section_type == 'builder':
+            config = copy.deepcopy(DEFAULTS_BUILDER)
+            config.update(section)
+            builders[section_name] = coerce_values(DEFAULTS_BUILDER, config)
+        elif section_type == 'releases':
+            releases = section
+    return releases, keys, repos, builders
+
+
+def _ansi_c_unescape(text):
+    '''Decode content of bash $'...' string - escapes give bytes (octal
+    ones for non-ASCII characters, in C locale), decoded as UTF-8 together
+    with the rest'''
+    def unescape(match):
+        octal, hexa, short_unicode, long_unicode, control, other = \
+            match.groups()
+        if octal or hexa:
+            return bytes(bytearray([int(octal or hexa, 8 if octal else 16)
+                                    & 0xff]))
+        if short_unicode or long_unicode:
+            char = '\\U{0:08x}'.format(int(short_unicode or long_unicode,
+                                             16))
+            try:
+                return char.encode('ascii').decode('unicode_escape').encode(
+                    'utf-8', 'replace')
+            except UnicodeDecodeError:
+                # not a valid code point
+                return b''
+        if control:
+            return bytes(bytearray([ord(control) & 0x1f]))
+        return _ANSI_C_ESCAPES.get(other, b'\\' + other)
+    return _ANSI_C_ESCAPE_RE.sub(unescape, text.encode('utf-8')).decode(
+        'utf-8', 'replace')
+
+
+def _parse_assignments(output):
+    '''Parse output of `make get-vars` (shell assignments, quoted by printf
+    %q)'''
+    values = {}
+    for line in output.splitlines():
+        name, sep, value = line.partition('=')
+        if not sep:
+            continue
+        if value.startswith("$'") and value.endswith("'"):
+            # values with control characters
+            value = _ansi_c_unescape(value[2:-1])
+        else:
+            value = ''.join(shlex.split(value))
+        values[name] = value
+    return values
+
+
+def _submit_make(dir_builder, args, env):
+    return get_runner().submit(
+        ['make', '--always-make', '--quiet', '--directory', dir_builder] +
+        args, env=env)
+
+
+def _dir_builder(dir_builder):
+    return os.path.abspath(dir_builder or os.path.curdir)
+
+
+def _data_files(dir_builder, data_file):
+    if not data_file:
+        return []
+    return [os.path.join(dir_builder, data_file),
+            os.path.join(dir_builder, OVERRIDE_DATA)]
+
+
+def _cache_key(dir_builder, data_files):
+    stats = []
+    for path in [os.path.join(dir_builder, 'Makefile'),
+                 os.path.join(dir_builder, BUILDER_CONF),
+                 os.path.join(dir_builder, OVERRIDE_CONF)] + data_files:
+        try:
+            st = os.stat(path)
+            stats.append((path, st.st_ino, st.st_size, st.st_mtime))
+        except OSError:
+            stats.append((path, None))
+    # settings can be given also in the environment
+    return dir_builder, tuple(stats), tuple(sorted(os.environ.items()))
+
+
+def _read(dir_builder, data_files):
+    env = os.environ.copy()
+    # do not (re)generate .colors.mk
+    env['NO_COLOR'] = '1'
+    if not os.path.exists(os.path.join(dir_builder, BUILDER_CONF)):
+        env.setdefault('BUILDERCONF',
+            os.path.join(dir_builder, CONFIG_DIR, MASTER_TEMPLATE))
+
+    # independent of each other, run them at once
+    variables = _submit_make(dir_builder, ['get-vars'],
+        dict(env, GET_VARS=' '.join(VARIABLES)))
+    dists_vm_all = _submit_make(dir_builder, ['get-vars'],
+        dict(env, GET_VARS='DISTS_VM', SETUP_MODE='1'))
+    about = _submit_make(dir_builder, ['about'], env)
+    variables = _parse_assignments(variables.result())
+    dists_vm_all = _parse_assignments(dists_vm_all.result())['DISTS_VM']
+    about = about.result()
+
+    parser = configparser.ConfigParser(dict_type=collections.OrderedDict)
+    # readfp is the only one in python 2, and removed in python 3.12
+    read_file = getattr(parser, 'read_file', None) or parser.readfp
+    for data_file in data_files:
+        if os.path.exists(data_file):
+            with codecs.open(data_file, 'r', 'utf8') as data:
+                read_file(data)
+    releases, keys, repos, builders = parse_sections(parser)
+
+    return Snapshot(
+        dir_builder=dir_builder,
+        variables=FrozenDict((name, variables.get(name, ''))
+                             for name in VARIABLES),
+        dists_vm_all=tuple(dists_vm_all.split()),
+        about=about,
+        releases=freeze(releases or {}),
+        keys=freeze(keys),
+        repos=freeze(repos),
+        builders=freeze(builders),
+    )
+
+
+def load(dir_builder=None, data_file=SETUP_DATA):
+    '''Return configuration Snapshot of builder in *dir_builder* (current
+    directory by default).
+
+    *data_file* is the setup data file, relative to *dir_builder*; use None
+    to skip reading it. Raises vanirbuilder.runner.CommandError (a
+    subprocess.CalledProcessError) if Makefiles cannot be evaluated.
+    '''
+    dir_builder = _dir_builder(dir_builder)
+    data_files = _data_files(dir_builder, data_file)
+    key = _cache_key(dir_builder, data_files)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+    snapshot = _read(dir_builder, data_files)
+    with _cache_lock:
+        _cache[key] = snapshot
+    return snapshot
+
+
+def invalidate():
+    '''Drop all cached snapshots - for changes not covered by the cache key,
+    like builder plugins Makefiles'''
+    with _cache_lock:
+        _cache.clear()
+
+
+def create_builder_conf(dir_builder=None, force=False):
+    '''Copy example-configs/templates.conf to builder.conf, unless it exists
+    already (or *force* is set). Returns path of builder.conf.
+
+    Raises IOError on failure.
+    '''
+    dir_builder = _dir_builder(dir_builder)
+    conf_builder = os.path.join(dir_builder, BUILDER_CONF)
+    if os.path.exists(conf_builder) and not force:
+        return conf_builder
+
+    conf_template = os.path.join(dir_builder, CONFIG_DIR, MASTER_TEMPLATE)
+    with codecs.open(conf_template, 'r', 'utf8') as template:
+        text = template.read()
+    # ABOUT
+    text = text.replace('@echo "{0}"'.format(MASTER_TEMPLATE),
+                        '@echo "{0}"'.format(BUILDER_CONF))
+    if os.path.lexists(conf_builder):
+        os.remove(conf_builder)
+    with codecs.open(conf_builder, 'w', 'utf8') as builder_conf:
+        builder_conf.write(text)
+    shutil.copymode(conf_template, conf_builder)
+    invalidate()
+    return conf_builder
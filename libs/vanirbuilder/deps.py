@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+# pylint: disable=E1101,W1401
+
+'''Check and install vanir-builder dependencies.'''
+
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+import time
+
+from subprocess import (Popen, STDOUT)
+
+from ansi import ANSIColor
+from vanirbuilder import BUILDER_CONF, MASTER_TEMPLATE
+from vanirbuilder.utils import exit, getchar  # pylint: disable=W0622
+
+
+def get_builder_deps():
+    '''Install vanir-builder depends if they are not already installed.
+    '''
+    env = os.environ.copy()
+    if not os.path.exists(BUILDER_CONF):
+        env['BUILDERCONF'] = MASTER_TEMPLATE
+
+    try:
+        env['GET_VAR'] = 'DEPENDENCIES'
+        dependencies = subprocess.check_output(
+            ['make', '--always-make', '--quiet', 'get-var'],
+            env=env
+        ).strip()
+        env.pop('GET_VAR')
+    except subprocess.CalledProcessError:
+        print ('\nAn error occurred trying to determine dependencies and therefore setup must now exit')
+        print ('Exiting!')
+        exit()
+
+    return dependencies.split(' ')
+
+
+def install_deps(packages=None):
+    '''Call vanir-builder make-deps to install packages if they are not already installed.
+
+    The DEPENDENCIES env variable will contain any packages to update.
+    '''
+    packages = packages or []
+
+    try:
+        from subprocess import DEVNULL  # py3k
+    except ImportError:
+        DEVNULL = open(os.devnull, 'wb')
+
+    ansi = ANSIColor()
+    dependencies = set()
+    packages += get_builder_deps()
+
+    # Only add packages to dependency list if they are not installed
+    for package in packages:
+        proc = Popen(['rpm', '-q', '--whatprovides', package], stdout=DEVNULL, stderr=DEVNULL)
+        proc.wait()
+        if proc.returncode:
+            dependencies.add(package)
+
+    if dependencies:
+        env = os.environ.copy()
+        dependencies = ' '.join(list(dependencies))
+
+        # Prompt and confirm installation of dependencies
+        os.system('clear')
+        message = 'The following dependencies have not been met:\n'
+        print ('{ansi[blue]}{0}{ansi[red]}{1}{ansi[normal]}\r\r'.format(
+            message,
+            dependencies,
+            ansi=ansi))
+        print ('\nEnter \'Y\' to install {ansi[red]}ALL{ansi[normal]} dependencies now, or anything else to quit [YyNnQq]: '.format(
+            ansi=ansi
+        ))
+        char = getchar()
+        if char.lower() != 'y':
+            print ('\nYou selected not to install the dependencies and therefore setup must now exit'.format(
+                ansi=ansi
+            ))
+            print ('Exiting!')
+            exit()
+
+        # User confirmed installation of dependencies
+        os.system('clear')
+        sys.stdout.write(
+            'Waiting for {ansi[red]}{0}{ansi[normal]} to install\n'.format(
+                dependencies,
+                ansi=ansi
+            )
+        )
+        sys.stdout.flush()
+
+        env['DEPENDENCIES'] = dependencies
+        proc = Popen(
+            ['make', 'install-deps'],
+            stdout=DEVNULL,
+            stderr=STDOUT,
+            env=env
+        )
+        while proc.poll() is None:
+            sys.stdout.write('{ansi[red]}.{ansi[normal]}'.format(ansi=ansi))
+            sys.stdout.flush()
+            time.sleep(1)
+        print
+
+        if proc.returncode:
+            print ('\nThere was an error installing dependencies!{ansi[blue]}{ansi[normal]} and therefore setup must now exit'.format(
+                ansi=ansi
+            ))
+            print ('Exiting!')
+            exit()
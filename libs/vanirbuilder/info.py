@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+# pylint: disable=E1101,W1401
+
+'''Display builder configuration (`setup.py info`).'''
+
+from __future__ import unicode_literals
+
+import codecs
+import re
+import shlex
+
+from ansi import ANSIColor
+from vanirbuilder.utils import exit  # pylint: disable=W0622
+
+
+def parse_parentheses(text):
+    '''A very simple lexer to parse round parentheses.
+    '''
+    ansi = ANSIColor()
+
+    lexer = shlex.shlex(text)
+    lexer.whitespace = '\t\r\n'
+
+    text = ''
+    raw = ''
+    count = 0
+
+    for token in lexer:
+        chars = token
+        if chars[0] in '\'"' and chars[-1] in '\'"':
+            new_chars = parse_parentheses(chars[1:-1])
+            text += chars[0] + new_chars + chars[-1]
+            continue
+        if token == '(':
+            count += 1
+            if raw and raw[-1] == '$':
+                chars = '{ansi[blue]}{0}'.format(chars, ansi=ansi)
+        elif token == ')':
+            if count == 1:
+                chars = '{0}{ansi[normal]}'.format(chars, ansi=ansi)
+            count -= 1
+        elif count:
+            if raw and raw[-1] != '(':
+                chars = '{ansi[black]}{0}'.format(chars, ansi=ansi)
+
+        raw += token
+        text += chars
+
+    return text
+
+
+def display_configuration(filename):
+    '''Display the configuration file.
+    '''
+    ansi = ANSIColor()
+    print '{ansi[bold]}{ansi[black]}{0}:{ansi[normal]}'.format(
+        filename,
+        ansi=ansi
+    )
+    try:
+        with codecs.open(filename, 'r', 'utf8') as infile:
+            for line in infile:
+                match = re.match(
+                    r'(?P<text>.*?(?=#)|.*)(?P<comment>([#]+.*)|)',
+                    line.rstrip()
+                )
+                if match:
+                    line = ''
+                    text = match.groupdict()['text']
+                    comment = match.groupdict()['comment']
+                    if match.groupdict()['text']:
+                        var = re.match(r'(?P<var>.*)(?P<text>[?:]?=.*)', text)
+                        target = re.match(
+                            r'(?P<target>.*[:]+)(?P<text>.*)', text
+                        )
+                        text = parse_parentheses(text)
+
+                        if var:
+                            line += '{ansi[blue]}{d[var]}{ansi[normal]}{d[text]}'.format(
+                                d=var.groupdict(),
+                                ansi=ansi
+                            )
+                        elif target:
+                            line += '{ansi[red]}{d[target]}{ansi[normal]}{d[text]}'.format(
+                                d=target.groupdict(),
+                                ansi=ansi
+                            )
+                        else:
+                            line += '{ansi[black]}{0}{ansi[normal]}'.format(
+                                text,
+                                ansi=ansi
+                            )
+
+                    if comment:
+                        line += '{ansi[green]}{0}{ansi[normal]}'.format(
+                            comment,
+                            ansi=ansi
+                        )
+                print line
+    except IOError, err:
+        exit(err)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+'''Running external commands (make, git, gpg) for setup.py and
+vanirbuilder.config.
+
+Plain subprocess semantics: a command runs to completion, its output is
+returned as text and a non-zero exit status raises CommandError (a
+subprocess.CalledProcessError). Commands not depending on each other can be
+started with submit() and run concurrently in a small pool of threads.
+
+Every spawned process is counted and timed, see Runner.stats. The runner used
+by the other modules (get_runner()) can be replaced with set_runner() - for
+example with a Runner subclass overriding spawn() to stub the commands in
+tests.
+
+Works with both python 2 and 3.
+'''
+
+from __future__ import unicode_literals
+
+import collections
+import os
+import subprocess
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+MAX_WORKERS = 4
+
+CommandStat = collections.namedtuple('CommandStat',
+                                     ['args', 'returncode', 'duration'])
+
+
+class CommandError(subprocess.CalledProcessError):
+    '''Command exited with non-zero status'''
+    def __init__(self, args, returncode, output, stderr):
+        super(CommandError, self).__init__(returncode, args, output)
+        self.stderr = stderr
+        self.message = '{0}\n{1}'.format(
+            super(CommandError, self).__str__(), stderr).strip()
+
+    def __str__(self):
+        return self.message
+
+
+class Pending(object):
+    '''Command submitted to the pool'''
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+    def result(self):
+        '''Wait for the command to finish; return its output, or raise its
+        error'''
+        # wait with a timeout, so KeyboardInterrupt is not blocked
+        while not self._done.wait(1):
+            pass
+        if self._error is not None:
+            raise self._error  # pylint: disable=E0702
+        return self._result
+
+
+class Runner(object):
+    '''Runs commands, keeping statistics of spawned processes'''
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self.stats = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._workers = 0
+
+    def spawn(self, args, input_text, env, cwd):
+        '''Run the process; return (returncode, stdout, stderr)'''
+        with open(os.devnull, 'rb') as devnull:
+            proc = subprocess.Popen(
+                args,
+                stdin=devnull if input_text is None else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+                cwd=cwd
+            )
+            stdout, stderr = proc.communicate(
+                None if input_text is None else input_text.encode('utf-8'))
+        return (proc.returncode, stdout.decode('utf-8', 'replace'),
+                stderr.decode('utf-8', 'replace'))
+
+    def run(self, args, input_text=None, env=None, cwd=None, check=True):
+        '''Run command *args* and return its output.
+
+        *input_text* is given on standard input (nothing by default). With
+        *check*, non-zero exit status raises CommandError.
+        '''
+        args = list(args)
+        start = time.time()
+        returncode, stdout, stderr = self.spawn(args, input_text, env, cwd)
+        with self._lock:
+            self.stats.append(
+                CommandStat(tuple(args), returncode, time.time() - start))
+        if check and returncode != 0:
+            raise CommandError(args, returncode, stdout, stderr)
+        return stdout
+
+    def submit(self, args, **kwargs):
+        '''Start run() of the command in the pool; returns Pending'''
+        pending = Pending()
+        self._queue.put((pending, args, kwargs))
+        with self._lock:
+            # workers are started on demand, up to max_workers
+            if self._workers < self.max_workers:
+                self._workers += 1
+                worker = threading.Thread(target=self._worker)
+                worker.daemon = True
+                worker.start()
+        return pending
+
+    def _worker(self):
+        while True:
+            pending, args, kwargs = self._queue.get()
+            try:
+                pending._finish(  # pylint: disable=W0212
+                    result=self.run(args, **kwargs))
+            except Exception as err:  # pylint: disable=W0703
+                pending._finish(error=err)  # pylint: disable=W0212
+
+    def summary(self):
+        '''Return (number of processes spawned, total time spent in them)'''
+        with self._lock:
+            return len(self.stats), sum(stat.duration for stat in self.stats)
+
+
+_runner = Runner()
+
+
+def get_runner():
+    return _runner
+
+
+def set_runner(runner):
+    '''Use *runner* for all the commands; returns the previous one'''
+    global _runner  # pylint: disable=W0603
+    previous, _runner = _runner, runner
+    return previous
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+# pylint: disable=E1101,W1401
+
+'''Helpers shared by setup.py commands.'''
+
+from __future__ import unicode_literals
+
+import codecs
+import os
+import shutil
+import sys
+import tty
+
+from textwrap import dedent
+
+from vanirbuilder import BACKUP_EXTENSION, BUILDER_CONF
+
+
+def exit(*varargs, **kwargs):  # pylint: disable=W0622
+    '''Function to exit.  Maybe restoring some files before exiting.
+    '''
+    kwargs['title'] = 'System Exit!'
+    kwargs['width'] = 80
+    kwargs['height'] = 0  # Auto height
+
+    try:
+        DefaultUI.ui.infobox(*varargs, **kwargs)
+    except AttributeError:
+        pass
+
+    # Restore original template.conf
+    conf_builder = os.path.join(os.path.abspath(os.path.curdir), BUILDER_CONF)
+    if os.path.exists(conf_builder + BACKUP_EXTENSION):
+        shutil.move(conf_builder + BACKUP_EXTENSION, conf_builder)
+
+    sys.exit()
+
+
+def getchar():
+    try:
+        import termios
+    except ImportError:
+        import msvcrt
+        return msvcrt.getchar()
+
+    def _getchar():
+        fd = sys.stdin.fileno()
+        old_settings = termios.tcgetattr(fd)
+        try:
+            tty.setraw(fd)
+            char = sys.stdin.read(1)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+        return char
+
+    return _getchar()
+
+
+def write_file(filename, text):
+    try:
+        with codecs.open(filename, 'w', 'utf8') as outfile:
+            outfile.write(dedent(text))
+    except IOError, err:
+        exit(err)
+
+
+def is_linkable(source, target, replace_file=False, replace_link=False):
+    '''Return True if target can be linked to source.
+    '''
+    # Source does not exist or is a broken link
+    if not source or not os.path.exists(source):
+        return False
+
+    # Target does not exist or is a broken link
+    if target and not os.path.exists(target):
+        return True
+
+    # Source and target are same as indicated by device and i-node
+    # number
+    if os.path.samefile(source, target):
+        return False
+
+    # Target is a regular file and 'replace_file' is False
+    if not replace_file:
+        if os.path.exists(target) and not os.path.islink(target):
+            return False
+
+    # Target is a link and 'replace_link' is True
+    if replace_link and os.path.islink(target):
+        return True
+
+    # Most likely target is a link and 'replace_link' is False
+    return False
+
+
+def soft_link(source, target, replace_file=False, replace_link=False):
+    '''Attempt to soft-link a file.  Exit with message on failure.
+    '''
+    if is_linkable(source, target, replace_file, replace_link):
+        try:
+            if os.path.lexists(target):
+                os.remove(target)
+            os.symlink(source, target)
+        except OSError, err:
+            exit(
+                'Error linking:\n{0} to {1}\n\n{2}.'.format(
+                    target, source, err.strerror
+                )
+            )
+    else:
+        message = 'Unable to link target file to source.'
+        exit(
+            'Error linking:\n{0} to {1}\n\n{2}'.format(
+                target, source, message
+            )
+        )
+
+
+class DefaultUI(object):
+    '''Default UI contains pointer to selected UI.
+    '''
+    ui = None
+
+    @classmethod
+    def __init__(cls, ui):
+        cls.ui = ui
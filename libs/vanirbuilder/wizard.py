@@ -0,0 +1,1430 @@
+# -*- coding: utf-8 -*-
+# vim: set ft=python ts=4 sw=4 sts=4 et :
+
+# pylint: disable=E1101,W1401
+
+'''Configuration wizard (`setup.py wizard`).'''
+
+from __future__ import unicode_literals
+
+import codecs
+import collections
+import copy
+import os
+import re
+import subprocess
+import ConfigParser
+
+from textwrap import dedent, wrap
+
+from ansi import ANSIColor
+from vanirbuilder import (
+    BACKUP_EXTENSION, BUILDER_CONF, CONFIG_DIR, DIALOG, GNUPGHOME,
+    GPG_KEY_SERVER, MASTER_TEMPLATE, OVERRIDE_CONF, OVERRIDE_DATA,
+    VANIR_DEVELOPERS_KEYS
+)
+from vanirbuilder.config import (
+    coerce_value, create_builder_conf, load as load_config, parse_sections
+)
+from vanirbuilder.deps import install_deps
+from vanirbuilder.info import display_configuration
+from vanirbuilder.runner import CommandError, get_runner
+from vanirbuilder.utils import (  # pylint: disable=W0622
+    DefaultUI, exit, is_linkable, soft_link
+)
+
+
+class DialogUI(DefaultUI):
+    '''UI Interface to `dialog` API.
+    '''
+    from dialog import (Dialog, ExecutableNotFound)
+
+    try:
+        from textwrap import indent
+    except ImportError:
+
+        @staticmethod
+        def indent(text, prefix, predicate=None):
+            l = []
+            for line in text.splitlines(True):
+                if (callable(predicate) and predicate(line)) \
+                   or (not callable(predicate) and predicate) \
+                   or (predicate is None and line.strip()):
+                    line = prefix + line
+                l.append(line)
+            return ''.join(l)
+
+    # Initialize a dialog.Dialog instance
+    try:
+        dialog = Dialog(dialog=DIALOG)
+    except ExecutableNotFound:
+        install_deps(['dialog'])
+        dialog = Dialog(dialog=DIALOG)
+
+    @classmethod
+    def __init__(cls):
+        cls.dialog.set_background_title("Vanir Builder Configuration Utility")
+        super(DialogUI, cls).__init__(cls)
+
+    @classmethod
+    def _auto_height(cls, width, text):
+        _max = max(8, 5 + len(wrap(text, width=width)))  # Min of 8 rows
+        _min = min(22, _max)  # Max of 22 rows
+        return _min
+
+    @classmethod
+    def yesno(cls, **info):
+        '''YesNo dialog.
+        '''
+        default = {'colors': True, 'width': 60, 'height': 8, }
+
+        default.update(info)
+        code = cls.dialog.yesno(**default)
+
+        if code == cls.dialog.OK:
+            return True
+        elif code == cls.dialog.CANCEL:
+            return False
+        elif code == cls.dialog.ESC:
+            exit('Escape key pressed. Exiting.')
+
+    @classmethod
+    def msgbox(cls, *varargs, **info):
+        '''Msgbox dialog.
+
+        Only displays if text is provided. Text can be provided in varargs
+        '''
+        default = {
+            'colors': True,
+            'title': 'vanir Setup Information.',
+            'width': 72,
+            'height': 8,
+            'text': ''
+        }
+
+        default.update(info)
+        if varargs:
+            default['text'] = ' '.join(varargs)
+
+        if not default['height']:
+            default['height'] = cls._auto_height(
+                default['width'], default['text']
+            )
+
+        if default['text']:
+            cls.dialog.msgbox(**default)
+
+    @classmethod
+    def infobox(cls, *varargs, **info):
+        '''Infobox dialog.
+
+        Only displays if text is provided. Text can be provided in varargs
+        '''
+        default = {
+            'colors': True,
+            'title': 'vanir Setup Information.',
+            'width': 72,
+            'height': 8,
+            'text': ''
+        }
+
+        default.update(info)
+        if varargs:
+            default['text'] = ' '.join(varargs)
+
+        if not default['height']:
+            default['height'] = cls._auto_height(
+                default['width'], default['text']
+            )
+
+        if default['text']:
+            cls.dialog.infobox(**default)
+
+    @classmethod
+    def list_done(cls, code, tag, helper=None):
+        if not helper:
+            helper = {}
+        no_help = "You asked for help about something called '{0}'. Sorry, but I am quite incompetent in this matter."
+
+        if code == 'help':
+            cls.msgbox(
+                helper.get(tag[0], no_help.format(tag[0])),
+                height=0,
+                width=60
+            )
+            return False
+
+        elif code == cls.dialog.CANCEL:
+            exit('User aborted setup.')
+
+        elif code == cls.dialog.ESC:
+            exit('User aborted setup.')
+
+        else:
+            return True
+
+    @classmethod
+    def checklist(cls, **info):
+        '''Checklist dialog.
+        '''
+        default = {
+            'colors': True,
+            'height': 0,
+            'width': 0,
+            'list_height': 0,
+            'choices': [],
+            'title': '',
+            'help_button': False,
+            'item_help': False,
+            'help_tags': False,
+            'help_status': False,
+            'text': '',
+        }
+        default.update(info)
+        helper = default.pop('helper', {})
+
+        while True:
+            code, tag = cls.dialog.checklist(**default)
+            if cls.list_done(code, tag, helper):
+                break
+
+        return tag
+
+    @classmethod
+    def radiolist(cls, **info):
+        '''Radiolist dialog.
+        '''
+        default = {
+            'colors': True,
+            'height': 0,
+            'width': 0,
+            'list_height': 0,
+            'choices': [],
+            'title': '',
+            'help_button': False,
+            'item_help': False,
+            'help_tags': False,
+            'help_status': False,
+            'text': '',
+        }
+        default.update(info)
+        helper = default.pop('helper', {})
+
+        while True:
+            code, tag = cls.dialog.radiolist(**default)
+            if cls.list_done(code, tag, helper):
+                break
+
+        return tag
+
+    @classmethod
+    def release(cls, **info):
+        '''Display `select release` dialog of vanir release version to build.
+        '''
+        return cls.radiolist(**info)
+
+    @classmethod
+    def override(cls, **info):
+        '''Display use override confirmation.
+        '''
+        return cls.yesno(**info)
+
+    @classmethod
+    def repo(cls, **info):
+        '''Display `choose repo` dialog.
+        '''
+        return cls.radiolist(**info)
+
+    @classmethod
+    def ssh_access(cls, **info):
+        '''Display ssh-access dialog.
+        '''
+        return cls.yesno(**info)
+
+    @classmethod
+    def template_only(cls, **info):
+        '''Display dialog choice of building only templates.
+        '''
+        return cls.yesno(**info)
+
+    @classmethod
+    def dists(cls, **info):
+        '''Display DISTS_VM's for selection.
+        '''
+        return cls.checklist(**info)
+
+    @classmethod
+    def builders(cls, **info):
+        '''Display BUILDER_PLUGINS's for selection.
+        '''
+        return cls.checklist(**info)
+
+    @classmethod
+    def verify_keys(cls, **info):
+        '''Display `verify keys` confirmation dialog.
+        '''
+        default = {'height': 12, }
+        default.update(info)
+        return cls.yesno(**default)
+
+    @classmethod
+    def get_sources(cls, **info):
+        '''Display get-sources dialog.
+        '''
+        result = cls.yesno(**info)
+        get_sources = 1 if result else 0
+
+        # Download sources
+        if get_sources:
+            try:
+                # py3k
+                from subprocess import DEVNULL  # pylint: disable=W0404
+            except ImportError:
+                DEVNULL = open(os.devnull, 'wb')
+
+            env = os.environ.copy()
+            env['bold'] = ''
+            env['normal'] = ''
+            env['black'] = ''
+            env['red'] = ''
+            env['green'] = ''
+            env['blue'] = ''
+            env['white'] = ''
+
+            args = ['make', 'get-sources']
+            p = subprocess.Popen(
+                args,
+                stdout=subprocess.PIPE,
+                stderr=DEVNULL,
+                close_fds=True,
+                env=env
+            )
+
+            default = {
+                #'colors': True,
+                #'scrollbar': True,
+                'height': 40,
+                'width': 120,
+            }
+
+            cls.dialog.programbox(
+                fd=p.stdout.fileno(),
+                text="Get sources",
+                **default
+            )
+            retcode = p.wait()
+
+            # Context manager support for subprocess.Popen objects requires
+            # Python 3.2 or later.
+            p.stdout.close()
+            return retcode
+
+
+class Config(object):
+    '''Configuration objects holds all config data.
+
+    Provides provides methods to read and write the data
+    '''
+    MARKER = object()
+
+    _makefile_vars = {
+        'about': '',
+        'release': '',
+        'ssh_access': 0,
+        'template_only': 0,
+        'git_baseurl': '',
+        'git_prefix': '',
+        'git_prefix_default': '',
+        'use_vanir_repo_version': '',
+        'use_vanir_repo_testing': '',
+        'dist_dom0_selected': '',
+        'dists_vm_all': [],
+        'dists_vm_selected': [],
+        'builders_selected': [],
+        'template_aliases_reversed': [],
+        'template_labels': [],
+        'template_labels_reversed': [],
+    }
+
+    def __init__(self, filename, **options):
+        '''Init.
+
+        filename is the name of the main configuration file to load which
+        is typically .salt.conf and is configurable with command-line option
+        '-c'
+        '''
+        self.filename = filename
+        self.options = options
+
+        self.dir_builder = self.options.get('dir_builder') or os.path.abspath(
+            os.path.curdir
+        )
+        self.dir_configurations = os.path.join(self.dir_builder, CONFIG_DIR)
+
+        # Override configuration filename will override and merge into .setup.data
+        self.conf_override_data = os.path.join(self.dir_builder, OVERRIDE_DATA)
+
+        self.parser = ConfigParser.ConfigParser(
+            dict_type=collections.OrderedDict
+        )
+        self.parser.add_section('makefile')
+        self.sections = []
+        self.releases = collections.OrderedDict()
+        self.keys = collections.OrderedDict()
+        self.repos = collections.OrderedDict()
+        self.builders = collections.OrderedDict()
+
+        self._init_makefile_vars()
+
+        self.conf_template = os.path.join(
+            self.dir_configurations, MASTER_TEMPLATE
+        )
+        self.conf_override = os.path.join(self.dir_builder, OVERRIDE_CONF)
+        self.conf_builder = os.path.join(self.dir_builder, BUILDER_CONF)
+
+        # Copy example-configs/template.conf to builder.conf if
+        # the configuration file does not yet exist
+        self._create_builder_conf(force=False)
+
+        # Needed for overrides, get it while Makefiles are parsed
+        self._branch = get_runner().submit(
+            ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
+            cwd=self.dir_builder
+        )
+
+        # Parse Makefiles
+        self._parse_makefiles()
+
+        # Set up any branch specific override configurations
+        self._overrides()
+
+        # Load .setup.data
+        if filename and os.path.exists(filename):
+            self._load()
+            if os.path.exists(self.conf_override_data):
+                self._load(self.conf_override_data)
+
+    def _init_makefile_vars(self):
+        for key, value in self._makefile_vars.items():
+            setattr(self, key, value)
+
+    def _create_builder_conf(self, force=False):
+        '''Copies example-configs/template.conf to builder.conf
+        '''
+        try:
+            create_builder_conf(self.dir_builder, force=force)
+        except (IOError, OSError), err:
+            exit(err)
+
+    #def __getattribute__(self, name):
+    #    return super(Config, self).__getattribute__(name)
+
+    def __setattr__(self, name, value):
+        if name in self._makefile_vars:
+            default = self._makefile_vars[name]
+            value = coerce_value(default, value)
+            self.parser.set('makefile', name, value)
+        return super(Config, self).__setattr__(name, value)
+
+    def _load(self, filename=None):
+        if not filename:
+            filename = self.filename
+
+        self.parser.readfp(codecs.open(filename, 'r', 'utf8'))
+        releases, keys, repos, builders = parse_sections(self.parser)
+        self.keys.update(keys)
+        self.repos.update(repos)
+        self.builders.update(builders)
+        if releases is not None:
+            self.releases = releases
+
+    def _overrides(self):
+        '''Set up any branch specific override configurations.
+        '''
+        #--------------------------------------------------------------------------
+        # See if a branch specific override configuration file exists
+        #--------------------------------------------------------------------------
+        branch = self._branch.result().strip()
+        override_path = None
+
+        # Skip if overrides already exists and is a regular file
+        if not (
+            os.path.exists(self.conf_override) and
+            not os.path.islink(self.conf_override)
+        ):
+            directory = self.dir_configurations
+            override = os.path.basename(self.conf_override)
+
+            patterns = []
+            # Example: example-configs/r3-feature_branch-override.conf
+            #          example-configs/r3-master-override.conf
+            patterns.append(
+                '{0}/r{1}-{2}-{3}'.format(
+                    directory, self.release, branch, override
+                )
+            )
+
+            # Example: example-configs/feature_branch-override.conf
+            #          example-configs/master-override.conf
+            patterns.append('{0}/{1}-{2}'.format(directory, branch, override))
+
+            # Example: example-configs/override.conf
+            patterns.append('{0}/{1}'.format(directory, override))
+
+            for pattern in patterns:
+                if os.path.exists(pattern):
+                    override_path = pattern
+                    break
+
+            if is_linkable(
+                override_path,
+                self.conf_override,
+                replace_link=True
+            ):
+                info = {
+                    'title':
+                    'Use Branch Specific Override Configuration File?',
+                    'default_button': 'yes',
+                    'text': dedent(
+                        '''\
+                    A branch specific configuration file was found in your personal directory:
+                    {0}.
+
+                    Would you like to use and override the other provided repos?
+                    '''.format(override_path)
+                    ),
+                }
+
+                # Link if user confirmed override
+                if DefaultUI.ui.override(**info):
+                    soft_link(
+                        override_path,
+                        self.conf_override,
+                        replace_link=True
+                    )
+
+                    # Re-parse Makefiles
+                    self._parse_makefiles()
+
+    def _parse_makefiles(self):
+        '''Read settings resolved by Makefiles (builder.conf included)
+        '''
+        try:
+            snapshot = load_config(self.dir_builder, data_file=None)
+        except (OSError, subprocess.CalledProcessError):
+            return
+
+        variables = snapshot.variables
+        self.release = variables['RELEASE']
+        self.ssh_access = variables['SSH_ACCESS']
+        self.template_only = variables['TEMPLATE_ONLY']
+        self.builders_selected = variables['BUILDER_PLUGINS_ALL']
+        self.git_baseurl = variables['GIT_BASEURL']
+        self.git_prefix = variables['GIT_PREFIX']
+        self.git_prefix_default = self.git_prefix
+        self.use_vanir_repo_version = variables['USE_VANIR_REPO_VERSION']
+        self.use_vanir_repo_testing = variables['USE_VANIR_REPO_TESTING']
+        self.dists_vm_selected = variables['DISTS_VM'].split()
+        self.dist_dom0_selected = variables['DIST_DOM0'].split()
+        self.dists_vm_all = list(snapshot.dists_vm_all)
+
+        aliases = variables['TEMPLATE_ALIAS'].split()
+        self.template_aliases = dict(
+            [
+                (item.split(':')) for item in aliases
+            ]
+        )
+        self.template_aliases_reversed = dict(
+            [
+                (
+                    value, key
+                ) for key, value in self.template_aliases.items()
+            ]
+        )
+
+        labels = variables['TEMPLATE_LABEL'].split()
+        self.template_labels = dict([(item.split(':')) for item in labels])
+        self.template_labels_reversed = dict(
+            [
+                (
+                    value, key
+                ) for key, value in self.template_labels.items()
+            ]
+        )
+
+        self.about = snapshot.about
+
+    def write_configuration(self):
+        '''Write builder.conf configuration.
+        '''
+        replace = ReplaceInplace(self.conf_builder)
+        dists_vm = ''
+
+        ### -- INFO -----------------------------------------------------------
+        # Format about
+        info = '''\
+            ################################################################################
+            #
+            # vanir Release: {vars[release]}
+            # Source Prefix: {vars[git_prefix]} (repo)
+            #
+            # Master Configuration File(s):
+            # {about}
+            #
+            # builder.conf copied from:
+            # {vars[conf_template]}
+            #
+            ################################################################################
+            '''.format(
+            about=' '.join(self.about.split()),
+            vars=vars(self)
+        )
+
+        ### -- DISTS_VM -------------------------------------------------------
+        for dist in self.dists_vm_selected:
+            dists_vm += 'DISTS_VM += {0}\n{1}'.format(dist, '              ')
+        dists_vm = dists_vm.strip()
+
+        dists = '''\
+            ifneq "$(SETUP_MODE)" "1"
+
+              # Enabled DISTS_VMs
+              DISTS_VM :=
+              {dists_vm}
+
+            endif
+            '''.format(
+            dists_vm=dists_vm
+        )
+
+        ### -- BUILDER_PLUGINS ------------------------------------------------
+        plugins = ''
+        for plugin in self.builders_selected:
+            plugins += 'BUILDER_PLUGINS += {0}\n{1}'.format(
+                plugin, '              '
+            )
+        plugins = plugins.strip()
+
+        plugins = '''\
+
+              # Enabled BUILDER_PLUGINS
+              BUILDER_PLUGINS :=
+              {plugins}
+            '''.format(
+            plugins=plugins
+        )
+
+        # INFO
+        replace.add(
+            **{
+                'insert_after': r'.*[[]=setup info start=[]]',
+                'insert_until': r'.*[[]=setup info stop=[]]',
+                'text': dedent(info).rstrip('\n'),
+            }
+        )
+
+        # DISTS_VM
+        replace.add(
+            **{
+                'insert_after': r'.*[[]=setup dists start=[]]',
+                'insert_until': r'.*[[]=setup dists stop=[]]',
+                'text': dedent(dists).rstrip('\n'),
+            }
+        )
+
+        # BUILDER_PLUGINS
+        replace.add(
+            **{
+                'insert_after': r'.*[[]=setup plugins start=[]]',
+                'insert_until': r'.*[[]=setup plugins stop=[]]',
+                'text': dedent(plugins),
+            }
+        )
+
+        # RELEASE
+        replace.add(
+            **{
+                'replace': r'RELEASE[ ]*[?:]?=[ ]*[\d.]+',
+                'text': r'RELEASE := {0}'.format(self.release),
+            }
+        )
+
+        # SSH_ACCESS
+        replace.add(
+            **{
+                'replace': r'SSH_ACCESS[ ]*[?:]?=[ ]*[\d]',
+                'text': r'SSH_ACCESS := {0}'.format(self.ssh_access),
+            }
+        )
+
+        # GIT_BASEURL
+        replace.add(
+            **{
+                'replace': r'GIT_BASEURL[ ]*[?:]?=[ ]*.*',
+                'text': r'GIT_BASEURL := {0}'.format(self.git_baseurl),
+            }
+        )
+
+        # GIT_PREFIX
+        replace.add(
+            **{
+                'replace': r'GIT_PREFIX[ ]*[?:]?=[ ]*.*',
+                'text': r'GIT_PREFIX := {0}'.format(self.git_prefix),
+            }
+        )
+
+        # TEMPLATE_ONLY
+        replace.add(
+            **{
+                'replace': r'TEMPLATE_ONLY[ ]*[?:]?=[ ]*.*',
+                'text': r'TEMPLATE_ONLY ?= {0}'.format(self.template_only),
+            }
+        )
+
+        # VANIR_REPOSITORIES
+        replace.add(
+            **{
+                'replace': r'^.*USE_VANIR_REPO_TESTING[ ]*[?:]?=[ ]*[\d]',
+                'text': r'USE_VANIR_REPO_TESTING = {0}'.format(self.use_vanir_repo_testing),
+            }
+        )
+        if self.use_vanir_repo_testing == "1":
+              self.use_vanir_repo_version = self.release
+
+        if self.use_vanir_repo_version == self.release:
+            use_vanir_repo_version = r'USE_VANIR_REPO_VERSION = $(RELEASE)'
+        else:
+            use_vanir_repo_version = r'# USE_VANIR_REPO_VERSION = $(RELEASE)'
+
+        replace.add(
+            **{
+                'replace': r'^.*USE_VANIR_REPO_VERSION[ ]+[?]?[=].*$',
+                'text': use_vanir_repo_version,
+            }
+        )
+
+        # INCLUDE_OVERRIDE_CONF
+        if os.path.exists(self.conf_override):
+            override = r'INCLUDE_OVERRIDE_CONF ?= true'
+        else:
+            override = r'#INCLUDE_OVERRIDE_CONF ?= true'
+        replace.add(
+            **{
+                'replace': r'^.*INCLUDE_OVERRIDE_CONF[ ]+[?]?[=].*$',
+                'text': r'{0}'.format(override),
+            }
+        )
+
+        # Start the search and replace process on the configuration file
+        replace.start()
+
+    def display_configuration(self):
+        ansi = ANSIColor()
+        display_configuration(self.conf_builder)
+        info = '\nNew configuration file written to: {0}\n'.format(
+            self.conf_builder
+        )
+
+        install_vanir = '''
+            Complete vanir Build Steps
+            --------------------------
+            make install-deps
+            make get-sources
+            make vanir
+            make iso
+            '''
+
+        install_vanir_vm = '''
+            Template Only Build Steps
+            -------------------------
+            make install-deps
+            make get-sources
+            make vanir-vm
+            make template
+            '''
+
+        if self.template_only:
+            info += dedent(install_vanir_vm)
+        else:
+            info += dedent(install_vanir)
+        print '{ansi[green]}{0}{ansi[normal]}'.format(info, ansi=ansi)
+
+
+class Wizard(Config):
+    ''''''
+
+    def __init__(self, ui, **kwargs):
+        self.ui = ui
+        DefaultUI.ui = ui
+        self.cli_args = kwargs
+        super(Wizard, self).__init__(kwargs['config_filename'], **kwargs)
+
+    def __call__(self):
+        ## Check / Install Keys
+        ## set force value to 'force' to force re-download and verify
+        self.verify_keys(self.keys, force=False)
+
+        ## Choose release version
+        ## Soft link 'examples/templates.conf' to 'builder.conf'
+        self.set_release()
+
+        ## Prompt for selection of base repo to use for build
+        self.set_repo()
+
+        ## Select which vanir packages repositories to use for partial builds
+        self.set_vanir_repos()
+
+        ## Choose if user has git ssh (commit) or http access to private repos
+        if os.path.exists(self.conf_override):
+            self.set_ssh_access()
+
+        ## Choose to build a complete system or templates only
+        self.set_template_only()
+
+        ## Select which templates to build (DISTS_VM)
+        self.set_dists()
+
+        ## Enable builders
+        self.set_builders()
+
+        ## Write builder.conf
+        self.write_configuration()
+
+        ## Display builder.conf
+        self.display_configuration()
+
+    def check_gnupghome(self, gnupghome):
+        if not os.path.exists(gnupghome):
+            os.makedirs(gnupghome, mode=0700)
+
+    def gpg_verify_key(self, key_data):
+        verified = False
+        env = os.environ.copy()
+        env['GNUPGHOME'] = GNUPGHOME
+        self.check_gnupghome(GNUPGHOME)
+
+        runner = get_runner()
+        try:
+            text = runner.run(
+                ['gpg', '--with-colons', '--fingerprint', key_data['key']],
+                env=env
+            ).strip()
+        except CommandError:
+            return False
+
+        for fingerprint in text.split('\n'):
+            if fingerprint.startswith(u'fpr:') and fingerprint == key_data[
+                'verify'
+            ]:
+                verified = True
+                break
+
+        if not verified:
+            print runner.run(['gpg', '--fingerprint', key_data['key']], env=env)
+            return False
+
+        return verified
+
+    def verify_keys(self, keys, message=None, force=False):
+        env = os.environ.copy()
+        env['GNUPGHOME'] = GNUPGHOME
+        self.check_gnupghome(GNUPGHOME)
+
+        runner = get_runner()
+        # Check all the keys at once
+        listed = dict(
+            (
+                key_id, runner.submit(
+                    ['gpg', '--list-key', key_data['key']], env=env
+                )
+            ) for key_id, key_data in keys.items()
+        )
+
+        for key_id, key_data in keys.items():
+            key = key_data['key']
+            is_key_missing = True
+            try:
+                listed[key_id].result()
+                is_key_missing = False
+            except CommandError:
+                # will trigger installation and verification of keys
+                pass
+
+            if force or is_key_missing:
+                info = {
+                    'title': 'Add Key {0}'.format(key_id),
+                    'default_button': 'no',
+                }
+                if message:
+                    info[
+                        'text'
+                    ] = u'Owner: {key_data[owner]}\n\n{0}\n\nSelect "Yes" to add or "No" to exit'.format(
+                        message,
+                        key_data=key_data
+                    )
+                elif force:
+                    info[
+                        'text'
+                    ] = u'Owner: {key_data[owner]} forced get.\n\nSelect "Yes" to re-add or "No" to exit'.format(
+                        key_data=key_data
+                    )
+                else:
+                    info[
+                        'text'
+                    ] = u'Owner: {key_data[owner]} key does not exist.\n\nSelect "Yes" to add or "No" to exit'.format(
+                        key_data=key_data
+                    )
+
+                if not self.ui.verify_keys(**info):
+                    exit(
+                        'User aborted setup: Exiting setup since keys can not be installed'
+                    )
+
+                # Receive key from keyserver
+                else:
+                    try:
+                        runner.run(
+                            [
+                                'gpg', '--keyserver', GPG_KEY_SERVER,
+                                '--recv-keys', key
+                            ],
+                            env=env
+                        )
+                        runner.run(
+                            ['gpg', '--import-ownertrust'],
+                            input_text='{0}:6:\n'.format(key),
+                            env=env
+                        )
+                    except CommandError, err:
+                        print err.message
+                        exit(err.message)
+
+            # Verify key on every run
+            result = self.gpg_verify_key(key_data)
+            if not result:
+                exit(
+                    {
+                        'title':
+                        '{key_data[owner]} fingerprint failed!'.format(
+                            key_data=key_data
+                        ),
+                        'text':
+                        '\nWrong fingerprint\n{key_data[fingerprint]}\n\nExiting!'.format(
+                            key_data=key_data
+                        ),
+                    }
+                )
+
+        # Add developers keys
+        try:
+            runner.run(['gpg', '--import', VANIR_DEVELOPERS_KEYS], env=env)
+        except CommandError, err:
+            exit(
+                'Unable to import vanir developer keys: {0}. Please install them manually.\n{1}'.format(
+                    VANIR_DEVELOPERS_KEYS, err
+                )
+            )
+
+        return True
+
+    def set_release(self):
+        '''Select release version of vanir to build.
+        '''
+        choices = []
+        default = self.release or self.releases.pop('default')
+
+        for release, description in self.releases.items():
+            if release in ['default']:
+                continue
+            selected = str(release) == str(default)
+            choices.append((release, description, selected))
+
+        info = {
+            'title': 'Choose Which vanir Release To Use To Build Packages',
+            'choices': choices,
+            'width': 76,
+            'height': 16,
+        }
+
+        self.release = str(self.ui.release(**info))  # pylint: disable=W0201
+
+    def set_repo(self):
+        '''Set source repo prefix.
+        '''
+        choices = []
+        default_set = False
+        full_prefix = '{0}/{1}'.format(self.git_baseurl, self.git_prefix)
+
+        for repo in self.repos.values():
+            toggle = full_prefix.endswith(repo['prefix'])
+            if toggle:
+                default_set = True
+            choices.append((repo['prefix'], repo['description'], toggle))
+
+        choices.insert(
+            0, (
+                self.git_prefix_default, 'Stable - Default Repo',
+                not default_set
+            )
+        )
+
+        info = {
+            'title': 'Choose Source Repos To Use To Build Packages',
+            'choices': choices,
+            'width': 76,
+            'height': 16,
+        }
+
+        self.git_prefix = self.ui.repo(**info)  # pylint: disable=W0201
+
+    def set_ssh_access(self):
+        '''Set GIT_BASEURL and GIT_PREFIX to allow ssh (write) access to repo.
+         Convert:
+           `GIT_BASEURL` from `git://github.com` to `git@github.com:repo`
+         - and -
+           `GIT_PREFIX` from `repo/vanir-` to `vanir-`
+        '''
+        default_button = 'yes' if self.ssh_access else 'no'
+        info = {
+            'title': 'Enable SSH Access',
+            'default_button': default_button,
+            'text': dedent(
+                '''\
+                Do you have ssh access to the repos?
+
+                Select 'Yes' to configure urls to match git or 'No' for https"
+            '''
+            ),
+        }
+        result = self.ui.ssh_access(**info)
+        ssh_access = 1 if result else 0
+
+        if ssh_access:
+            if '/' in self.git_prefix:
+                repo, prefix = self.git_prefix.split('/')
+                self.git_prefix = prefix  # pylint: disable=W0201
+            else:
+                repo = self.git_baseurl.split(':')[-1]
+                prefix = self.git_prefix
+
+        # Re-write baseurl depending on ssh_access mode
+        baseurl = re.match(
+            r'^(.*//|.*@)(.*(?=[:])|.*)([:].*|)', self.git_baseurl
+        )
+        if ssh_access:
+            self.git_baseurl = 'git@{0}:{1}'.format(
+                baseurl.group(2), repo
+            )  # pylint: disable=W0201
+        else:
+            self.git_baseurl = 'https://{0}'.format(
+                baseurl.group(2)
+            )  # pylint: disable=W0201
+
+        self.ssh_access = ssh_access  # pylint: disable=W0201
+
+    def set_template_only(self):
+        '''Choose to build a complete system or templates only.
+        '''
+        default_button = 'yes' if self.template_only else 'no'
+        info = {
+            'title': 'Build Template Only?',
+            'default_button': default_button,
+            'text': dedent(
+                '''\
+                Would you like to build only the templates?
+
+                Select 'Yes' to to only build templates or 'No' for complete build
+            '''
+            ),
+        }
+        self.template_only = self.ui.template_only(
+            **info
+        )  # pylint: disable=W0201
+
+    def set_dists(self):
+        ''''''
+        choices = []
+        helper = {}
+        for dist in self.dists_vm_all:
+            alias = self.template_aliases.get(dist, '')
+            aliasr = self.template_aliases_reversed.get(dist, '')
+            label = self.template_labels.get(alias or dist, '')
+
+            tag = aliasr or dist
+            item = label
+            help_text = dist if dist != tag else ''
+
+            helper[tag] = dedent(
+                '''\
+                \Zb\Z4Distribution:\Zn {0}
+                \Zb\Z4Template Label:\Zn {1}
+                \Zb\Z4Template Alias:\Zn {2}
+            '''
+            ).format(tag, item, help_text)
+
+            if help_text:
+                help_text = 'Alias value: {0}'.format(help_text)
+
+            choices.append(
+                (
+                    tag, item, dist in self.dists_vm_selected, help_text
+                )
+            )
+
+        info = {
+            'helper': helper,
+            'height': 0,
+            'width': 0,
+            'list_height': 0,
+            'choices': choices,
+            'title': 'Template Distribution Selection',
+            'help_button': True,
+            'item_help': True,
+            'help_tags': True,
+            'help_status': True,
+            'text': dedent(
+                '''\
+                \Zb\Z4Left column contains DIST name\Zn
+                \Zb\Z4Right column contains TEMPLATE_LABEL\Zn
+            '''
+            ),
+        }
+
+        self.dists_vm_selected = self.ui.dists(**info)  # pylint: disable=W0201
+
+    def set_vanir_repos(self):
+        ''''''
+        choices = []
+        default_stable = False
+        default_testing = False
+
+        if self.use_vanir_repo_testing == "1":
+            default_testing = True
+            self.use_vanir_repo_version = self.release
+
+        if self.use_vanir_repo_version == self.release:
+            default_stable = True
+
+        choices.insert(0, ('current', 'Stable repository', default_stable))
+        choices.insert(1, ('current-testing', 'Testing repository', default_testing))
+
+        info = {
+            'title': 'Choose Pre-Built Packages Repositories',
+            'choices': choices,
+            'width': 76,
+            'height': 10,
+        }
+
+        vanir_repos_selected = self.ui.dists(**info)  # pylint: disable=W0201
+        if 'current' in vanir_repos_selected:
+            self.use_vanir_repo_version = self.release
+        else:
+            self.use_vanir_repo_version = ''
+
+        if 'current-testing' in vanir_repos_selected:
+            self.use_vanir_repo_testing = "1"
+        else:
+            self.use_vanir_repo_testing = "0"
+
+    def get_sources(self):
+        '''Prompt user to get sources.
+        '''
+        info = {
+            'title': 'Get sources',
+            'default_button': 'yes',
+            'height': 0,
+            'width': 0,
+            'text': dedent(
+                '''\
+                Either a BUILDER_PLUGIN has been added or vanir sources have not
+                yet been downloaded.
+
+                Would you like to get vanir source files now? If you choose no you
+                may need to run set again after getting sources manually to be able
+                to select some VMs for building.
+
+                Select 'Yes' to download and merge sources or 'No' to skip"
+            '''
+            ),
+        }
+        self.ui.get_sources(**info)
+
+    def set_builders(self):
+        ''''''
+
+        # Build required depends list
+        def _depends(builder, key):
+            depends = []
+            if not builder.get(key, None):
+                return depends
+            items = builder[key]
+            # Filter builder depends to only dists_vm_selected
+            for item in items:  # dist in dists from require_in
+                for dist in self.dists_vm_selected + \
+                        (['dom0'] if not self.template_only else []):
+                    alias = self.template_aliases.get(dist, dist)
+                    if item in alias:
+                        if dist not in depends:
+                            depends.append(dist)
+            return depends
+
+        def _missing():
+            missing = {}
+            for builder in self.builders.values():
+                # Check to see if a disabled builder has dist vms selected and warn
+                if builder['id'] not in self.builders_selected:
+                    for dist in self.dists_vm_selected + \
+                            (['dom0'] if not self.template_only else []):
+                        alias = self.template_aliases.get(dist, dist)
+                        for item in builder['require_in']:
+                            if item in alias:
+                                missing.setdefault(builder['id'], [])
+                                if dist not in missing[builder['id']]:
+                                    missing[builder['id']].append(dist)
+            return missing
+
+        def _requires():
+            requires = {}
+            for builder_name in self.builders_selected:
+                builder = self.builders.get(builder_name, {})
+                for plugin in builder.get('require', []):
+                    if plugin not in self.builders_selected:
+                        requires.setdefault(builder_name, [])
+                        requires[builder_name].append(plugin)
+            return requires
+
+        def _requires_key():
+            for builder_name in self.builders_selected:
+                builder = self.builders.get(builder_name, {})
+                if builder.get('key', False):
+                    # Setup will exit if user chooses not to install key
+                    message = 'The BUILDER_PLUGIN {0} requires a third party key.'.format(
+                        builder['id']
+                    )
+                    key_id = '0x{0}'.format(builder['key'][-8:])
+                    self.verify_keys({key_id: builder}, message=message)
+            return True
+
+        def _colorize(items, missing):
+            colorized = []
+            for item in items:
+                if item in missing:
+                    colorized.append('\Z1{0}\Zn'.format(item))
+                else:
+                    colorized.append('\Z2{0}\Zn'.format(item))
+            return colorized
+
+        while True:
+            choices = []
+            helper = {}
+            missing = _missing()
+            requires = _requires()
+
+            for builder in self.builders.values():
+                # Skip development plugins if development mode was not enabled (--development)
+                if builder.get('development', None) and not self.cli_args.get(
+                    'development', None
+                ):
+                    continue
+
+                tag = builder['id']
+                help_text = builder['description']
+
+                helper_text = dedent(
+                    '''\
+                    \Zb\Z4Builder Plugin:\Zn {0}
+                    \Zb\Z4Description:\Zn {1}
+                '''
+                ).format(tag, help_text)
+
+                require = []
+                for builder_name in builder['require']:
+                    if builder_name in self.builders_selected:
+                        require.append('\Z2{0}\Zn'.format(builder_name))
+                    else:
+                        require.append('\Z1{0}\Zn'.format(builder_name))
+
+                if require:
+                    helper_text += '\Zb\Z4This plugin requires: {0}\n'.format(
+                        ' '.join(require)
+                    )
+                    require = 'Requires: {0}'.format(' '.join(require))
+                else:
+                    helper_text += '\Zb\Z4This plugin requires:\Zn None\n'
+
+                require_in = _colorize(
+                    _depends(builder, 'require_in'), missing.get(
+                        tag, []
+                    )
+                ) or None
+                if require_in:
+                    helper_text += '\Zb\Z4This plugin is needed by:\Zn {0}\n'.format(
+                        ' '.join(require_in)
+                    )
+                    require_in = 'For: {0}'.format(' '.join(require_in))
+                else:
+                    helper_text += '\Zb\Z4This plugin is needed by:\Zn None\n'
+
+                optional = _depends(builder, 'optional') or None
+                if optional:
+                    helper_text += '\Zb\Z4Optional plugin for:\Zn {0}\n'.format(
+                        ' '.join(optional)
+                    )
+                    optional = 'For: {0}'.format(' '.join(optional))
+
+                item = require or require_in or optional or ''
+                helper[tag] = helper_text
+                choices.append(
+                    (
+                        tag, item, builder['id'] in self.builders_selected,
+                        help_text
+                    )
+                )
+
+            info = {
+                'helper': helper,
+                'height': 0,
+                'width': 0,
+                'list_height': 0,
+                'choices': choices,
+                'title': 'Builder Plugins Selection',
+                'help_button': True,
+                'item_help': True,
+                'help_tags': True,
+                'help_status': True,
+                'text': dedent(
+                    '''\
+                    Select from the following list any builder plugins to be enabled.
+
+                    Note that some plugins are required to build specific VM's as will
+                    be indicated by the comment to the left of the plugin choice.
+                '''
+                ),
+            }
+
+            builders_selected = self.builders_selected
+            self.builders_selected = self.ui.builders(
+                **info
+            )  # pylint: disable=W0201
+
+            # Selected builders changed; write and reload config file to reflect
+            # changes
+            if builders_selected != self.builders_selected:
+                # Check if BUILDER_PLUGIN requires a key to install; prompt to install
+                # Setup will exit if user chooses not to install key
+                _requires_key()
+
+                self.write_configuration()
+                self._parse_makefiles()
+
+                # Download sources
+                # TODO: determine if BUILDER_PLUGIN has previously been downloaded
+                self.get_sources()
+                self._parse_makefiles()
+
+            missing = _missing()
+            requires = _requires()
+            if requires:
+                text = ''
+                for builder_name, missing_builder in requires.items():
+                    text += '\Z1{0}\Zn is selected to be installed but\n'.format(
+                        builder_name
+                    )
+                    text += '\Z4{0}\Zn is not enabled! Either enable \Z4{0}\Zn or disable \Z1{1}\Zn.\n\n'.format(
+                        ' '.join(missing_builder), builder_name
+                    )
+                self.ui.msgbox(text)
+            elif missing:
+                text = ''
+                for builder_name, missing_vms in missing.items():
+                    text += '\Z1{0}\Zn are selected to be installed but\n'.format(
+                        ' '.join(missing_vms)
+                    )
+                    text += '\Z4{0}\Zn is not enabled! Either enable \Z4{0}\Zn or exit to re-pick VMs.\n\n'.format(
+                        builder_name
+                    )
+                self.ui.msgbox(text)
+            else:
+                break
+
+
+class ReplaceInplace(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.rules = {}
+
+    defaults = {
+        # key to use to match line
+        'match_key': None,
+
+        # text will be inserted below pattern matched line. Keeps pattern.
+        'insert_after': None,
+
+        # all text before this line will be removed.  Keeps pattern
+        # if value is `None`, stop insert mode after initial insert
+        'insert_until': None,
+        'replace': None,
+        'text': None,
+        'find': None,
+        'start_line': None,
+        'stop_line': None,
+    }
+
+    def add(self, **kwargs):
+        default = copy.deepcopy(self.defaults)
+        default.update(kwargs)
+
+        if default['insert_after']:
+            default['insert_after'] = re.compile(
+                r'{0}'.format(
+                    default[
+                        'insert_after'
+                    ]
+                )
+            )
+            default['match_key'] = 'insert_after'
+
+            if default['insert_until']:
+                default['insert_until'] = re.compile(
+                    r'{0}'.format(
+                        default[
+                            'insert_until'
+                        ]
+                    )
+                )
+
+        elif default['replace']:
+            default['replace'] = re.compile(r'{0}'.format(default['replace']))
+            default['match_key'] = 'replace'
+
+        match_key = default[default['match_key']]
+        self.rules[match_key] = default
+
+    def start(self):
+        import fileinput
+        insert_mode = False
+        stop = []
+
+        for line in fileinput.input(
+            self.filename,
+            inplace=True,
+            backup=BACKUP_EXTENSION
+        ):
+            line = line.rstrip('\n')
+            for rule in self.rules:
+                if rule.search(line):
+                    if self.rules[rule]['match_key'] == 'insert_after':
+                        insert_mode = True
+                        stop.append(self.rules[rule]['insert_until'])
+                        print line
+                        print self.rules[rule]['text']
+                    elif self.rules[rule]['match_key'] == 'replace':
+                        line = rule.sub(self.rules[rule]['text'], line)
+
+            for rule in stop:
+                if re.match(rule, line):
+                    stop.remove(rule)
+                    insert_mode = False
+
+            if not insert_mode:
+                print line
@@ -1,5 +1,14 @@
 #!/bin/bash
 
+# Load builder configuration variables (given as arguments) into shell
+# variables of the same names, with a single make call. Variables declared
+# local by the caller are set as local.
+load_builder_vars() {
+    local vars
+    vars=$(make -s get-vars GET_VARS="$*") || return 1
+    eval "$vars"
+}
+
 build_failure() {
     local component=$1
     local package_set=$2
@@ -10,13 +19,12 @@ build_failure() {
     # don't let the API key be logged...
     local GITHUB_API_KEY
     local GITHUB_BUILD_ISSUES_REPO
-    RELEASE=$(make -s get-var GET_VAR=RELEASE)
-    GITHUB_API_KEY=$(make -s get-var GET_VAR=GITHUB_API_KEY)
-    GITHUB_BUILD_ISSUES_REPO=$(make -s get-var GET_VAR=GITHUB_BUILD_ISSUES_REPO)
+    load_builder_vars RELEASE GITHUB_API_KEY GITHUB_BUILD_ISSUES_REPO
     echo "Build failed: $component for $package_set (r$RELEASE $dist)" >&2
+    # return, not exit - the caller may have other builds to report or upload
     if [ -z "$GITHUB_API_KEY" ] || [ -z "$GITHUB_BUILD_ISSUES_REPO" ]; then
-        echo "No alternative way of build failure reporting (GITHUB_API_KEY, GITHUB_BUILD_ISSUES_REPO), exiting" >&2
-        exit 1
+        echo "No alternative way of build failure reporting (GITHUB_API_KEY, GITHUB_BUILD_ISSUES_REPO)" >&2
+        return 1
     fi
     curl -H "Authorization: token $GITHUB_API_KEY" \
 		-d "{ \"title\": \"Build failed: $component for $package_set ($RELEASE $dist)\",
@@ -44,8 +52,13 @@ tmpdir=$(mktemp -d)
 
 trap "cleanup" EXIT
 
-log_service_output_file="$tmpdir/build-log-filename"
+# Set where the name of the build log is saved (read by get_build_log_url),
+# needed for each build running in parallel
+set_build_log_file() {
+    log_service_output_file=$1
+    # enable logging (use qrexec policy to redirect to the right VM)
+    export VANIR_BUILD_LOG_CMD="qrexec-client-vm 'dom0' vanirbuilder.BuildLog >$log_service_output_file"
+}
 
-# enable logging (use qrexec policy to redirect to the right VM)
-export VANIR_BUILD_LOG_CMD="qrexec-client-vm 'dom0' vanirbuilder.BuildLog >$log_service_output_file"
+set_build_log_file "$tmpdir/build-log-filename"
 
@@ -2,51 +2,26 @@
 # ./umount_kill.sh chroot
 # 
 
+# scripts/umount-kill does the actual work, with a single scan of mounts and
+# processes; resolve its path now, as this file may be sourced from elsewhere
+UMOUNT_KILL_HELPER="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/umount-kill"
+
 # $1 = full path to mount; 
 # $2 = if set will not umount; only kill processes in mount
 umount_kill() {
     local MOUNTDIR="$1"
-    local PROMPT_SHOWN=""
+    local dry_run=
 
     # We need absolute paths here so we don't kill everything
     if ! [[ "$MOUNTDIR" = /* ]]; then
         MOUNTDIR="${PWD}/${MOUNTDIR}"
     fi
 
-    # Strip any extra trailing slashes ('/') from path if they exist
-    # since we are doing an exact string match on the path
-    MOUNTDIR=$(echo "$MOUNTDIR" | sed s#//*#/#g)
-
-    for dir in $(grep "$MOUNTDIR" /proc/mounts | cut -f2 -d" " | sort -r | grep "^$MOUNTDIR")
-    do
-        if [[ -z $PROMPT_SHOWN ]]; then
-            echo "-> Attempting to kill any processes still running in '$MOUNTDIR' before un-mounting"
-            PROMPT_SHOWN="yes"
-        fi
-
-        sudo lsof "$dir" 2> /dev/null | \
-            grep "$dir" | \
-            tail -n +2 | \
-            awk '{print $2}' | \
-            xargs --no-run-if-empty sudo kill -9
-
-        if ! [ "$2" ] && $(mountpoint -q "$dir"); then
-            echo "un-mounting $dir"
-            sudo umount -n "$dir" 2> /dev/null || \
-                sudo umount -n -l "$dir" 2> /dev/null || \
-                echo "umount $dir unsuccessful!"
-        elif ! [ "$2" ]; then
-            # Look for (deleted) mountpoints
-            echo "not a regular mount point: $dir"
-            base=$(basename "$dir") 
-            dir=$(dirname "$dir") 
-            base=$(echo "$base" | sed 's/[\].*$//')
-            dir="$dir/$base"
-            sudo umount -v -f -n "$dir" 2> /dev/null || \
-                sudo umount -v -f -n -l "$dir" 2> /dev/null || \
-                echo "umount $dir unsuccessful!"
-        fi
-    done
+    # UMOUNT_KILL_DRY_RUN=1 only prints what would be killed and un-mounted
+    if [ "$UMOUNT_KILL_DRY_RUN" = 1 ]; then
+        dry_run=--dry-run
+    fi
+    sudo "$UMOUNT_KILL_HELPER" ${2:+--kill-only} $dry_run "$MOUNTDIR"
 }
 
 kill_processes_in_mount() {